@@ -0,0 +1,284 @@
+"""
+colour_cache.py
+---------------
+This module defines the UserColourCache class, which fills in missing username colours
+for highlights. Twitch leaves `message.author.color` empty for many chatters, so the
+colour (and display name) is looked up through the Helix `GET /chat/color` endpoint and
+kept in an LRU cache with a time-to-live.
+
+Lookups are coalesced over a short window and sent in batches of up to 100 user ids,
+using a pooled `requests.Session` on a worker thread so the HTTP calls never run on the
+bot's event loop. Cache hits are answered synchronously. Failed or timed-out lookups are
+cached briefly as colourless, so an unavailable Helix does not delay every highlight.
+
+Classes:
+    - UserColourCache: LRU/TTL cache of user id -> (colour, display name) backed by
+      batched Helix lookups.
+
+Functions:
+    - default_colour: Pick a stable fallback colour for users who never set one.
+"""
+__author__ = "Jai Brown (JaINTP)"
+__copyright__ = "Copyright 2014, Jai Brown"
+__credits__ = ["Jai Brown",]
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "Jai Brown"
+__email__ = "jaintp.dev@gmail.com"
+__status__ = "Production"
+__date__ = "08/12/2024"
+
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+import asyncio
+import time
+import zlib
+import requests
+
+# Twitch's default chat colour palette, used for users who never picked a colour
+DEFAULT_COLOURS = (
+    '#FF0000', '#0000FF', '#008000', '#B22222', '#FF7F50',
+    '#9ACD32', '#FF4500', '#2E8B57', '#DAA520', '#D2691E',
+    '#5F9EA0', '#1E90FF', '#FF69B4', '#8A2BE2', '#00FF7F'
+)
+
+
+def default_colour(user_id):
+    """
+    Pick a fallback colour from Twitch's default palette. The same user always gets
+    the same colour.
+
+    Args:
+        user_id (str): The Twitch user id.
+
+    Returns:
+        str: A hex colour string.
+    """
+    user_id = str(user_id)
+    index = int(user_id) if user_id.isdigit() else zlib.crc32(user_id.encode())
+    return DEFAULT_COLOURS[index % len(DEFAULT_COLOURS)]
+
+
+class UserColourCache:
+    """
+    LRU cache with TTL of Twitch user id -> (colour, display name), filled by batched
+    Helix `GET /chat/color` requests.
+
+    Attributes:
+        MAX_BATCH_SIZE (int): Maximum number of user ids Helix accepts per request.
+        config (dict): Application configuration, used for the client ID and access token.
+        helix_url (str): Base URL of the Helix API; point this at a local stub for testing.
+        max_size (int): Maximum number of cached users.
+        ttl (float): Seconds a cached entry stays valid.
+        failure_ttl (float): Seconds a failed or timed-out lookup is cached as colourless.
+        batch_window (float): Seconds to wait for more misses before sending a batch.
+        session (requests.Session): Pooled HTTP session used for Helix requests.
+    """
+
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, config, session=None):
+        """
+        Initialize the cache.
+
+        Args:
+            config (dict): Configuration dictionary containing the `colour_lookup` section,
+                           `client_id` and `access_token`.
+            session (requests.Session, optional): HTTP session to use. A pooled session is created if omitted.
+        """
+        settings = config.get('colour_lookup') or {}
+        self.config = config
+        self.helix_url = settings.get('helix_url', 'https://api.twitch.tv/helix').rstrip('/')
+        self.max_size = settings.get('cache_size', 5000)
+        self.ttl = settings.get('cache_ttl', 3600)
+        self.failure_ttl = settings.get('failure_ttl', 30)
+        self.batch_window = settings.get('batch_window_ms', 50) / 1000
+
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session = session
+
+        self._entries = OrderedDict()  # User id -> (expires_at, colour, display_name)
+        self._pending = {}  # User id -> Future awaiting the next batch
+        self._in_flight = {}  # User id -> Future of a batch already sent
+        self._flush_handle = None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create a cache from the configuration, unless colour lookups are disabled.
+
+        Args:
+            config (dict): Configuration dictionary containing the `colour_lookup` section,
+                           `client_id` and `access_token`.
+
+        Returns:
+            UserColourCache or None: The cache, or None if `colour_lookup.enabled` is false.
+        """
+        settings = config.get('colour_lookup') or {}
+        return cls(config) if settings.get('enabled', True) else None
+
+    def get(self, user_id):
+        """
+        Return the cached entry for a user without blocking.
+
+        Args:
+            user_id (str): The Twitch user id.
+
+        Returns:
+            tuple or None: `(colour, display_name)` if cached and not expired, otherwise None.
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        return entry[1], entry[2]
+
+    def put(self, user_id, colour, display_name, ttl=None):
+        """
+        Store an entry, evicting the least recently used one if the cache is full.
+
+        Args:
+            user_id (str): The Twitch user id.
+            colour (str): The user's chat colour, or an empty string if they never set one.
+            display_name (str or None): The user's display name.
+            ttl (float, optional): Seconds the entry stays valid. Defaults to `ttl`.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        self._entries[user_id] = (time.monotonic() + ttl, colour, display_name)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def lookup(self, user_id):
+        """
+        Look up a user, queueing a Helix request on a cache miss. Must be called from
+        the running event loop.
+
+        Args:
+            user_id (str): The Twitch user id.
+
+        Returns:
+            asyncio.Future: Resolves to `(colour, display_name)`. The colour is empty if the
+                            user never set one or the lookup failed.
+        """
+        loop = asyncio.get_running_loop()
+        cached = self.get(user_id)
+        if cached is not None:
+            future = loop.create_future()
+            future.set_result(cached)
+            return future
+
+        existing = self._pending.get(user_id) or self._in_flight.get(user_id)
+        if existing is not None:
+            return existing
+
+        future = loop.create_future()
+        self._pending[user_id] = future
+        if len(self._pending) >= self.MAX_BATCH_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self):
+        """
+        Send all queued misses to Helix in batches of at most `MAX_BATCH_SIZE` ids.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending = list(self._pending.items())
+        self._in_flight.update(self._pending)
+        self._pending = {}
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(pending), self.MAX_BATCH_SIZE):
+            loop.create_task(self._fetch_batch(dict(pending[start:start + self.MAX_BATCH_SIZE])))
+
+    async def _fetch_batch(self, futures):
+        """
+        Fetch one batch on a worker thread and resolve the waiting futures.
+
+        Args:
+            futures (dict): User id -> Future for every user in the batch.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            colours = await loop.run_in_executor(None, self.fetch_colours, list(futures))
+        except Exception as e:
+            print(f"Error fetching user colours from Helix: {e}")
+            colours = None
+
+        for user_id, future in futures.items():
+            if colours is None:
+                # Cache the failure briefly so an unavailable Helix is not asked again straight away
+                result = ('', None)
+                self.put(user_id, *result, ttl=self.failure_ttl)
+            else:
+                # Users Helix does not return are cached as colourless to avoid asking again
+                result = colours.get(user_id, ('', None))
+                self.put(user_id, *result)
+            if self._in_flight.get(user_id) is future:
+                del self._in_flight[user_id]
+            if not future.done():
+                future.set_result(result)
+
+    async def resolve(self, user_id, timeout):
+        """
+        Look up a user's colour, waiting at most `timeout` seconds. Users without a
+        colour, and lookups that do not finish in time, get a default colour.
+
+        Args:
+            user_id (str): The Twitch user id.
+            timeout (float): Seconds to wait for the lookup.
+
+        Returns:
+            tuple: `(colour, display_name)`, where the colour is never empty.
+        """
+        try:
+            # Shield the lookup so a timeout here does not cancel the shared batch future
+            colour, display_name = await asyncio.wait_for(asyncio.shield(self.lookup(user_id)), max(0, timeout))
+        except asyncio.TimeoutError:
+            # Helix is slow or hanging; remember that briefly so later highlights do not wait too
+            self.put(user_id, '', None, ttl=self.failure_ttl)
+            colour, display_name = '', None
+        return colour or default_colour(user_id), display_name
+
+    def fetch_colours(self, user_ids):
+        """
+        Request the chat colours of up to `MAX_BATCH_SIZE` users from Helix. This is a
+        blocking call and is run on a worker thread.
+
+        Args:
+            user_ids (list): The Twitch user ids to look up.
+
+        Returns:
+            dict: User id -> `(colour, display_name)` for every user Helix returned.
+
+        Raises:
+            requests.RequestException: If the request fails.
+        """
+        headers = {
+            'Authorization': f"Bearer {self.config['access_token']}",
+            'Client-Id': self.config['client_id']
+        }
+        params = [('user_id', user_id) for user_id in user_ids]
+        response = self.session.get(f"{self.helix_url}/chat/color", headers=headers, params=params, timeout=10)
+        response.raise_for_status()
+        return {
+            item['user_id']: (item.get('color') or '', item.get('user_name'))
+            for item in response.json().get('data', [])
+        }
+
+    def close(self):
+        """
+        Close the pooled HTTP session.
+        """
+        self.session.close()
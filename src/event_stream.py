@@ -0,0 +1,168 @@
+"""
+event_stream.py
+---------------
+This module defines the EventStream class, a small Server-Sent Events broadcaster used
+by the web server's `/stream` endpoint. Display-only overlays can read highlights with
+the browser's native `EventSource` instead of loading the Socket.IO client and going
+through its handshake and polling upgrade.
+
+Classes:
+    - EventStream: Thread-safe publisher that fans events out to SSE subscribers, keeps
+      a short history for `Last-Event-ID` resume and sends periodic heartbeats.
+"""
+__author__ = "Jai Brown (JaINTP)"
+__copyright__ = "Copyright 2014, Jai Brown"
+__credits__ = ["Jai Brown",]
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "Jai Brown"
+__email__ = "jaintp.dev@gmail.com"
+__status__ = "Production"
+__date__ = "08/12/2024"
+
+from collections import deque
+from queue import Queue, Empty, Full
+from threading import Lock
+import json
+import time
+
+
+class EventStream:
+    """
+    Fans published events out to Server-Sent Events subscribers.
+
+    Attributes:
+        heartbeat_interval (float): Seconds of silence after which a heartbeat comment is sent.
+        retry_ms (int): Reconnection delay suggested to clients, in milliseconds.
+        queue_size (int): Maximum number of undelivered events per subscriber before it is dropped.
+    """
+
+    def __init__(self, history_size=100, heartbeat_interval=15, retry_ms=3000, queue_size=256):
+        """
+        Initialize the event stream.
+
+        Args:
+            history_size (int): Number of recent events kept for `Last-Event-ID` resume.
+            heartbeat_interval (float): Seconds of silence after which a heartbeat comment is sent.
+            retry_ms (int): Reconnection delay suggested to clients, in milliseconds.
+            queue_size (int): Maximum number of undelivered events per subscriber.
+        """
+        self.heartbeat_interval = heartbeat_interval
+        self.retry_ms = retry_ms
+        self.queue_size = queue_size
+        self._history = deque(maxlen=history_size)  # Encoded events, oldest first
+        self._subscribers = set()
+        # Start ids from the current time so they keep increasing across restarts and an
+        # overlay reconnecting with an id from a previous run still gets the new history
+        self._last_id = int(time.time() * 1000)
+        self._lock = Lock()
+
+    @staticmethod
+    def format_event(event_id, event, data):
+        """
+        Encode an event in the `text/event-stream` format.
+
+        Args:
+            event_id (int): The event id, sent back by clients as `Last-Event-ID`.
+            event (str): The event name.
+            data (dict): The JSON-serialisable event payload.
+
+        Returns:
+            str: The encoded event.
+        """
+        return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+    def publish(self, event, data):
+        """
+        Publish an event to every subscriber. Subscribers that have fallen too far behind
+        are dropped; their browsers reconnect and resume from the history.
+
+        Args:
+            event (str): The event name.
+            data (dict): The JSON-serialisable event payload.
+
+        Returns:
+            int: The id assigned to the event.
+        """
+        with self._lock:
+            self._last_id += 1
+            encoded = self.format_event(self._last_id, event, data)
+            self._history.append((self._last_id, encoded))
+
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.put_nowait(encoded)
+                except Full:
+                    self._drop(subscriber)
+            return self._last_id
+
+    def _drop(self, subscriber):
+        """
+        Remove a lagging subscriber and tell its reader to close the stream. Must be
+        called with the lock held.
+
+        Args:
+            subscriber (Queue): The subscriber's queue.
+        """
+        self._subscribers.discard(subscriber)
+        try:
+            while True:
+                subscriber.get_nowait()
+        except Empty:
+            pass
+        subscriber.put_nowait(None)
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a new subscriber, queueing any missed events after `last_event_id`.
+
+        Args:
+            last_event_id (int, optional): Id of the last event the client received.
+
+        Returns:
+            Queue: The subscriber's queue of encoded events.
+        """
+        # Leave room for a full history replay on top of the live backlog
+        subscriber = Queue(maxsize=self.queue_size + self._history.maxlen)
+        with self._lock:
+            if last_event_id is not None:
+                for event_id, encoded in self._history:
+                    if event_id > last_event_id:
+                        subscriber.put_nowait(encoded)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """
+        Remove a subscriber.
+
+        Args:
+            subscriber (Queue): The queue returned by `subscribe`.
+        """
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stream(self, last_event_id=None):
+        """
+        Generate the `text/event-stream` body for one client.
+
+        Args:
+            last_event_id (int, optional): Id of the last event the client received.
+
+        Yields:
+            str: Encoded events and heartbeat comments.
+        """
+        subscriber = self.subscribe(last_event_id)
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            while True:
+                try:
+                    encoded = subscriber.get(timeout=self.heartbeat_interval)
+                except Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                if encoded is None:
+                    return
+                yield encoded
+        finally:
+            self.unsubscribe(subscriber)
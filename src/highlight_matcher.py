@@ -0,0 +1,143 @@
+"""
+highlight_matcher.py
+--------------------
+This module holds the highlight matching rules used by the Twitch IRC client.
+Rules are compiled once from the configuration rather than on every chat message,
+and matching is a plain module-level function so it can be handed to a thread or
+process pool without dragging the bot instance along with it.
+
+Classes:
+    - HighlightRules: Compiled keyword/mention rules built from the configuration.
+
+Functions:
+    - match_message: Decide whether a chat message should be highlighted.
+    - init_worker: Load every tenant's rules into an offload worker once.
+    - match_in_worker: Match a message in an offload worker by tenant name.
+"""
+__author__ = "Jai Brown (JaINTP)"
+__copyright__ = "Copyright 2014, Jai Brown"
+__credits__ = ["Jai Brown",]
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "Jai Brown"
+__email__ = "jaintp.dev@gmail.com"
+__status__ = "Production"
+__date__ = "08/12/2024"
+
+import re
+
+# Tenant name -> HighlightRules, loaded once per offload worker by init_worker
+_worker_rules = {}
+
+
+class HighlightRules:
+    """
+    Compiled highlight rules for a single authenticated user.
+
+    Instances only hold plain values and compiled patterns, so they can be pickled
+    and sent to worker processes.
+
+    Attributes:
+        authenticated_user (str): Lower-cased login of the authenticated user.
+        case_sensitive (bool): Whether keyword matching respects case.
+        allow_non_mentions (bool): Whether a bare nickname (no @) triggers a highlight.
+        keyword_pattern (re.Pattern or None): Compiled keyword pattern, or None if no keywords are set.
+        offload_min_length (int): Messages at least this long are considered expensive to match.
+        offload_min_keywords (int): Rule sets with at least this many keywords are considered expensive.
+    """
+
+    def __init__(self, config, authenticated_user):
+        """
+        Compile the highlight rules from the configuration.
+
+        Args:
+            config (dict): Configuration dictionary containing the `words_to_highlight` section.
+            authenticated_user (str): Login of the authenticated Twitch user.
+        """
+        words_config = config.get('words_to_highlight') or {}
+        performance = config.get('performance') or {}
+        words_to_highlight = words_config.get('keywords') or []
+
+        self.authenticated_user = authenticated_user.lower()
+        self.case_sensitive = words_config.get('case_sensitive', False)
+        self.allow_non_mentions = config.get('allow_non_mentions', False)
+        self.offload_min_length = performance.get('offload_min_length', 200)
+        self.offload_min_keywords = performance.get('offload_min_keywords', 50)
+
+        # Prepare keywords for matching
+        if not self.case_sensitive:
+            words_to_highlight = {str(word).lower() for word in words_to_highlight}
+        else:
+            words_to_highlight = {str(word) for word in words_to_highlight}
+        self.keyword_count = len(words_to_highlight)
+
+        # An empty alternation would match every message, so only compile when there are keywords
+        if not words_to_highlight:
+            self.keyword_pattern = None
+        elif words_config.get('match_whole_word', False):
+            # Match whole words only
+            self.keyword_pattern = re.compile(r'\b(' + '|'.join(re.escape(word) for word in words_to_highlight) + r')\b')
+        else:
+            # Match partial words as well
+            self.keyword_pattern = re.compile('|'.join(re.escape(word) for word in words_to_highlight))
+
+    def is_expensive(self, content):
+        """
+        Check whether matching the given message is worth moving off the event loop.
+
+        Args:
+            content (str): The raw chat message content.
+
+        Returns:
+            bool: True if the message is long or the rule set is large.
+        """
+        return len(content) >= self.offload_min_length or self.keyword_count >= self.offload_min_keywords
+
+
+def match_message(rules, content):
+    """
+    Decide whether a chat message should be highlighted.
+
+    Args:
+        rules (HighlightRules): The compiled highlight rules.
+        content (str): The raw chat message content.
+
+    Returns:
+        bool: True if the message mentions the user or contains a keyword.
+    """
+    message_content = content if rules.case_sensitive else content.lower()
+    user = rules.authenticated_user
+
+    # Check if the message meets highlighting criteria
+    is_mention = f"@{user}" in message_content
+    is_highlight = is_mention or (rules.allow_non_mentions and user in message_content)
+    if is_highlight:
+        return True
+
+    return rules.keyword_pattern is not None and rules.keyword_pattern.search(message_content) is not None
+
+
+def init_worker(rules_by_tenant):
+    """
+    Load the compiled rules into an offload worker, so each offloaded message only
+    needs to carry the tenant name and the message text.
+
+    Args:
+        rules_by_tenant (dict): Tenant name -> HighlightRules.
+    """
+    _worker_rules.update(rules_by_tenant)
+
+
+def match_in_worker(tenant_name, content):
+    """
+    Decide whether a chat message should be highlighted, using the rules loaded by
+    `init_worker`.
+
+    Args:
+        tenant_name (str or None): The tenant whose rules to use.
+        content (str): The raw chat message content.
+
+    Returns:
+        bool: True if the message mentions the user or contains a keyword.
+    """
+    return match_message(_worker_rules[tenant_name], content)
@@ -0,0 +1,135 @@
+"""
+loop_watchdog.py
+----------------
+This module defines the LoopLagWatchdog class, which continuously measures how late
+the asyncio event loop is in waking up a sleeping task. A growing lag means something
+is blocking the loop (slow matching, synchronous HTTP calls, etc.) and delaying the
+reading of chat messages from the socket.
+
+Classes:
+    - LoopLagWatchdog: Samples asyncio loop lag at a fixed interval and reports it.
+"""
+__author__ = "Jai Brown (JaINTP)"
+__copyright__ = "Copyright 2014, Jai Brown"
+__credits__ = ["Jai Brown",]
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "Jai Brown"
+__email__ = "jaintp.dev@gmail.com"
+__status__ = "Production"
+__date__ = "08/12/2024"
+
+import asyncio
+
+
+class LoopLagWatchdog:
+    """
+    Measures asyncio event loop lag by sleeping for a fixed interval and recording
+    how much later than expected the loop resumed it.
+
+    Attributes:
+        interval (float): Seconds between lag samples.
+        warn_threshold (float): Lag in seconds above which a warning is printed.
+        report_interval (float): Seconds between summary reports, or 0 to disable them.
+        last_lag (float): The most recent lag sample in seconds.
+        max_lag (float): The largest lag seen since the last summary report.
+        samples (int): Number of samples taken since the last summary report.
+    """
+
+    def __init__(self, interval=1.0, warn_threshold_ms=100, report_interval=60):
+        """
+        Initialize the watchdog.
+
+        Args:
+            interval (float): Seconds between lag samples.
+            warn_threshold_ms (float): Lag in milliseconds above which a warning is printed.
+            report_interval (float): Seconds between summary reports, or 0 to disable them.
+        """
+        self.interval = interval
+        self.warn_threshold = warn_threshold_ms / 1000
+        self.report_interval = report_interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.samples = 0
+        self._total_lag = 0.0
+        self._task = None
+
+    @property
+    def running(self):
+        """
+        bool: True if the watchdog task is active.
+        """
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """
+        Start sampling on the currently running event loop. Calling this while the
+        watchdog is already running has no effect.
+        """
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        """
+        Stop sampling.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self):
+        """
+        Return the current lag statistics.
+
+        Returns:
+            dict: The last, maximum and mean lag in milliseconds, and the sample count.
+        """
+        mean_lag = self._total_lag / self.samples if self.samples else 0.0
+        return {
+            'last_ms': round(self.last_lag * 1000, 1),
+            'max_ms': round(self.max_lag * 1000, 1),
+            'mean_ms': round(mean_lag * 1000, 1),
+            'samples': self.samples
+        }
+
+    def record(self, lag):
+        """
+        Record a single lag sample, warning if it exceeds the threshold.
+
+        Args:
+            lag (float): The measured lag in seconds.
+        """
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self._total_lag += lag
+        self.samples += 1
+
+        if lag > self.warn_threshold:
+            print(f"Event loop lag warning: loop was blocked for {lag * 1000:.1f} ms")
+
+    def report(self):
+        """
+        Print a summary of the lag since the last report and reset the statistics.
+        """
+        stats = self.snapshot()
+        print(f"Event loop lag | last {stats['last_ms']} ms | mean {stats['mean_ms']} ms | "
+              f"max {stats['max_ms']} ms | {stats['samples']} samples")
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+        self.samples = 0
+
+    async def _run(self):
+        """
+        Sample the loop lag until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        next_report = loop.time() + self.report_interval
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self.record(max(0.0, now - expected))
+
+            if self.report_interval and now >= next_report:
+                self.report()
+                next_report = now + self.report_interval
@@ -3,6 +3,8 @@ main.py
 -------
 The entry point for the Twitch SignalR application. This script manages the initialization
 and orchestration of different components, including authentication, web server, and IRC client.
+When `tenants_dir` is set, highlights for every tenant configuration in that directory are
+served from this one process.
 
 Classes:
     - Application: Main application class that loads configuration, handles authentication,
@@ -23,12 +25,16 @@ __date__ = "08/12/2024"
 
 import webbrowser
 import threading
-from os import path
+import re
+from os import listdir, path
+from ruamel.yaml.error import YAMLError
 from auth_server import AuthServer
 from web_server import WebServer
 from twitch_irc_client import TwitchIRCClient
 from twitch_auth import TwitchAuth
 from config_handler import ConfigHandler
+from colour_cache import UserColourCache
+from tenant import Tenant, build_tenant_config
 
 
 class Application:
@@ -41,8 +47,12 @@ class Application:
         web_server (WebServer): Serves the frontend and manages WebSocket communication.
         irc_client (TwitchIRCClient): Handles Twitch chat interactions and emits events to the frontend.
         twitch_auth (TwitchAuth): Handles token management and validation.
+        tenants_dir (str or None): Directory of per-tenant configurations, or None in single-streamer mode.
     """
 
+    TENANT_NAME = re.compile(r'^[A-Za-z0-9_-]+$')
+    TWITCH_LOGIN = re.compile(r'^[A-Za-z0-9_]{1,25}$')
+
     def __init__(self):
         """
         Initializes the application by loading the configuration and creating instances
@@ -58,11 +68,14 @@ class Application:
         self.twitch_auth = TwitchAuth(self.config)
         self.irc_client = None  # Defer initialization until token validation
 
+        tenants_dir = self.config.get('tenants_dir')
+        self.tenants_dir = path.join(base_dir, '..', tenants_dir) if tenants_dir else None
+
     def save_config(self):
         """
         Save the updated configuration back to `config.yaml`.
         """
-        self.yaml_handler.save(self.config_path, self.config)
+        self.config_handler.save(self.config_path, self.config)
 
     def check_auth_token(self):
         """
@@ -99,12 +112,60 @@ class Application:
 
         return True
 
+    def load_tenants(self):
+        """
+        Loads every tenant configuration in `tenants_dir`. Each `<name>.yaml` file is merged
+        over the shared configuration and must set the streamer's Twitch `user_name`. Tenants
+        have no token session of their own: chat is read and colours are looked up with the
+        shared `access_token`. Tenants that cannot be read or have no valid `user_name` are skipped.
+
+        Returns:
+            list: The loaded tenants.
+        """
+        tenants = []
+        # A user's colour is the same in every channel, so all tenants share one cache,
+        # looked up with the shared token
+        colour_cache = UserColourCache.from_config(self.config)
+        for filename in sorted(listdir(self.tenants_dir)):
+            name, extension = path.splitext(filename)
+            if extension not in ('.yaml', '.yml'):
+                continue
+            if not self.TENANT_NAME.match(name):
+                print(f"Skipping tenant '{filename}': names may only contain letters, digits, '_' and '-'.")
+                continue
+
+            tenant_path = path.join(self.tenants_dir, filename)
+            try:
+                tenant_config = self.config_handler.load(tenant_path) or {}
+                if not isinstance(tenant_config, dict):
+                    print(f"Skipping tenant '{name}': configuration must be a mapping.")
+                    continue
+            except (OSError, YAMLError) as e:
+                print(f"Skipping tenant '{name}': {e}")
+                continue
+
+            user_name = tenant_config.get('user_name')
+            if not isinstance(user_name, str) or not self.TWITCH_LOGIN.match(user_name):
+                print(f"Skipping tenant '{name}': a valid Twitch 'user_name' is required.")
+                continue
+
+            config = build_tenant_config(self.config, tenant_config)
+            event_stream = self.web_server.add_tenant(name)
+            tenants.append(Tenant(name, config, user_name, event_stream, colour_cache))
+            print(f"Loaded tenant '{name}' for {user_name} | overlay at /t/{name}/")
+
+        return tenants
+
     def initialize_irc_client(self):
         """
-        Initializes the Twitch IRC client after a valid token is confirmed.
+        Initializes the Twitch IRC client after a valid token is confirmed. In multi-tenant
+        mode, the client joins every tenant's channels over one chat connection.
         """
         print("Initializing IRC client...")
-        self.irc_client = TwitchIRCClient(self.config, self.web_server.socketio)
+        tenants = self.load_tenants() if self.tenants_dir else None
+        if tenants is not None and not tenants:
+            print(f"No tenants were loaded from {self.tenants_dir}.")
+        self.irc_client = TwitchIRCClient(self.config, self.web_server.socketio, self.web_server.event_stream, tenants)
 
     def start_irc_client(self):
         """
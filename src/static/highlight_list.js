@@ -0,0 +1,105 @@
+/**
+ * highlight_list.js
+ * -----------------
+ * Shared rendering for the chat highlight pages. Both frontend.html (Socket.IO)
+ * and frontend_sse.html (Server-Sent Events) pass received `update_list`
+ * payloads to `addHighlight`, which displays the username, message and a
+ * countdown timer in the styled listbox.
+ */
+
+/**
+ * Adds a chat highlight to the listbox and removes it once its timeout expires.
+ *
+ * @param {Object} data - The highlight payload with `username`, `username_colour`,
+ *                        `message` and `timeout` (in ms).
+ */
+function addHighlight(data) {
+    const listBox = document.getElementById("listbox");
+
+    if (listBox) {
+        // Create a new div for the chat highlight
+        const newItem = document.createElement("div");
+        newItem.className = "listbox-item";
+
+        // Create a span for the username
+        const userSpan = document.createElement("span");
+        userSpan.className = "username";
+        userSpan.textContent = `${data.username}: `;
+
+        // Apply the username color if provided
+        if (data.username_colour) {
+            userSpan.style.color = data.username_colour;
+        } else {
+            console.warn("Username Colour is undefined, defaulting to white.");
+            userSpan.style.color = "#FFFFFF"; // Default color
+        }
+
+        // Create a span for the chat message
+        const textSpan = document.createElement("span");
+        textSpan.className = "text";
+        textSpan.textContent = data.message;
+
+        // Create a span for the countdown timer
+        const timerSpan = document.createElement("span");
+        timerSpan.className = "timer";
+
+        // Calculate the expiry time
+        const timeout = data.timeout; // Timeout duration from the server (in ms)
+        const expiryTime = Date.now() + timeout;
+
+        // Formats the time remaining into a human-readable format
+        function formatTimeLeft() {
+            const now = Date.now();
+            const diff = expiryTime - now;
+
+            if (diff <= 0) {
+                return "0s";
+            }
+
+            const seconds = Math.floor((diff / 1000) % 60);
+            const minutes = Math.floor((diff / (1000 * 60)) % 60);
+            const hours = Math.floor(diff / (1000 * 60 * 60));
+
+            if (hours > 0) {
+                return `${hours}h ${minutes}m ${seconds}s`;
+            } else if (minutes > 0) {
+                return `${minutes}m ${seconds}s`;
+            } else {
+                return `${seconds}s`;
+            }
+        }
+
+        // Updates the timer span with the remaining time
+        function updateTimer() {
+            timerSpan.textContent = formatTimeLeft();
+        }
+
+        updateTimer(); // Initial timer update
+
+        // Interval to update the timer every second
+        const interval = setInterval(() => {
+            updateTimer();
+            if (Date.now() >= expiryTime) {
+                // Remove the item once the timer expires
+                clearInterval(interval);
+                if (listBox.contains(newItem)) {
+                    listBox.removeChild(newItem);
+                }
+            }
+        }, 1000);
+
+        // Removes the item when clicked manually
+        newItem.onclick = () => {
+            clearInterval(interval);
+            listBox.removeChild(newItem);
+        };
+
+        // Append all spans to the chat highlight item
+        newItem.appendChild(userSpan);
+        newItem.appendChild(textSpan);
+        newItem.appendChild(timerSpan);
+        listBox.appendChild(newItem); // Add the new item to the listbox
+    } else {
+        console.error("Listbox element not found!");
+    }
+}
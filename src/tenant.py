@@ -0,0 +1,91 @@
+"""
+tenant.py
+---------
+This module defines the Tenant class, which bundles everything the IRC client needs to
+produce highlights for one streamer: their configuration, channels, compiled highlight
+rules and emit targets. A single-streamer setup is simply one tenant without a name;
+multi-tenant mode runs many tenants over one chat connection, one colour cache and one
+web server.
+
+Classes:
+    - Tenant: Per-streamer highlight state and emit targets.
+
+Functions:
+    - build_tenant_config: Merge a tenant's configuration file over the shared defaults.
+"""
+__author__ = "Jai Brown (JaINTP)"
+__copyright__ = "Copyright 2014, Jai Brown"
+__credits__ = ["Jai Brown",]
+__license__ = "MIT"
+__version__ = "1.0.0"
+__maintainer__ = "Jai Brown"
+__email__ = "jaintp.dev@gmail.com"
+__status__ = "Production"
+__date__ = "08/12/2024"
+
+from highlight_matcher import HighlightRules
+
+# Keys that identify the shared bot or a single tenant and are never inherited from the shared config
+TENANT_ONLY_KEYS = ('access_token', 'refresh_token', 'user_name', 'channels')
+
+
+def build_tenant_config(base_config, tenant_config):
+    """
+    Merge a tenant's configuration over the shared configuration. Top-level sections
+    set by the tenant replace the shared ones entirely.
+
+    Args:
+        base_config (dict): The shared application configuration.
+        tenant_config (dict): The tenant's own configuration.
+
+    Returns:
+        dict: The merged configuration.
+    """
+    merged = {key: value for key, value in base_config.items() if key not in TENANT_ONLY_KEYS}
+    merged.update(tenant_config or {})
+    return merged
+
+
+class Tenant:
+    """
+    Highlight state for one streamer.
+
+    Attributes:
+        name (str or None): Tenant name used in overlay URLs, or None in single-streamer mode.
+        config (dict): The tenant's configuration.
+        user_name (str): Twitch login of the tenant's streamer.
+        channels (list): Lower-cased channel names the tenant's highlights come from.
+        rules (HighlightRules): The tenant's compiled highlight rules.
+        colour_cache (UserColourCache or None): Colour cache shared by all tenants.
+        colour_timeout (float): Seconds a highlight waits for its colour lookup.
+        event_stream (EventStream or None): Server-Sent Events broadcaster for the tenant's overlays.
+    """
+
+    def __init__(self, name, config, user_name, event_stream=None, colour_cache=None):
+        """
+        Initialize the tenant.
+
+        Args:
+            name (str or None): Tenant name, or None in single-streamer mode.
+            config (dict): The tenant's configuration.
+            user_name (str): Twitch login of the tenant's streamer.
+            event_stream (EventStream, optional): Server-Sent Events broadcaster for the tenant.
+            colour_cache (UserColourCache, optional): Shared colour cache, or None to skip colour lookups.
+        """
+        self.name = name
+        self.config = config
+        self.user_name = user_name.lower()
+        self.channels = [channel.lower().lstrip('#') for channel in (config.get('channels') or [user_name])]
+        self.rules = HighlightRules(config, user_name)
+        self.event_stream = event_stream
+        self.colour_cache = colour_cache
+
+        colour_lookup = config.get('colour_lookup') or {}
+        self.colour_timeout = colour_lookup.get('lookup_timeout', 1.0)
+
+    @property
+    def room(self):
+        """
+        str or None: Socket.IO room the tenant's highlights are emitted to, or None to broadcast.
+        """
+        return self.name
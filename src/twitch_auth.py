@@ -90,6 +90,22 @@ class TwitchAuth:
         response = requests.get('https://id.twitch.tv/oauth2/validate', headers=headers)
         return response.status_code == 200
 
+    def get_login(self, access_token):
+        """
+        Retrieve the login of the user an access token belongs to.
+
+        Args:
+            access_token (str): The access token to validate.
+
+        Returns:
+            str or None: The user's login if the token is valid, otherwise None.
+        """
+        headers = {'Authorization': f'Bearer {access_token}'}
+        response = requests.get('https://id.twitch.tv/oauth2/validate', headers=headers, timeout=10)
+        if response.status_code == 200:
+            return response.json()['login']
+        return None
+
     def refresh_token(self, refresh_token):
         """
         Refresh an expired access token using a refresh token.
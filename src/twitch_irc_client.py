@@ -3,7 +3,8 @@ twitch_irc_client.py
 ---------------------
 This module defines the TwitchIRCClient class, which serves as a Twitch bot
 for monitoring chat messages and broadcasting specific events to a frontend
-via Flask-SocketIO.
+via Flask-SocketIO. One client can serve many tenants (streamers) over a single
+chat connection, routing each channel's messages to the tenants that watch it.
 
 Classes:
     - TwitchIRCClient: A Twitch chat bot that integrates with Flask-SocketIO
@@ -19,10 +20,16 @@ __email__ = "jaintp.dev@gmail.com"
 __status__ = "Production"
 __date__ = "08/12/2024"
 
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from twitchio.ext import commands
 from flask_socketio import SocketIO
-import requests
-import re
+from colour_cache import UserColourCache, default_colour
+from highlight_matcher import init_worker, match_in_worker, match_message
+from loop_watchdog import LoopLagWatchdog
+from tenant import Tenant
+from twitch_auth import TwitchAuth
+import asyncio
+import multiprocessing
 
 
 class TwitchIRCClient(commands.Bot):
@@ -33,30 +40,91 @@ class TwitchIRCClient(commands.Bot):
     Attributes:
         config (dict): Configuration dictionary with Twitch and application settings.
         socketio (SocketIO): Flask-SocketIO instance for real-time communication.
+        tenants (list): The tenants whose highlights this client produces.
+        channel_tenants (dict): Channel name -> tenants watching that channel.
     """
 
-    def __init__(self, config, socketio: SocketIO):
+    def __init__(self, config, socketio: SocketIO, event_stream=None, tenants=None):
         """
         Initialize the Twitch IRC client.
 
+        The username lookup below is a blocking HTTP call; it runs here, before the
+        bot's event loop is started, so it never stalls chat processing.
+
         Args:
             config (dict): Configuration dictionary containing access tokens and other settings.
             socketio (SocketIO): Flask-SocketIO instance for emitting events to the frontend.
+            event_stream (EventStream, optional): Server-Sent Events broadcaster that also receives highlights.
+            tenants (list, optional): Tenants to serve. If omitted, a single tenant is built from `config`.
         """
+        if tenants is None:
+            user_name = self.get_user_name(config)
+            tenants = [Tenant(None, config, user_name, event_stream, UserColourCache.from_config(config))]
+
+        self.channel_tenants = {}
+        for tenant in tenants:
+            for channel in tenant.channels:
+                self.channel_tenants.setdefault(channel, []).append(tenant)
+
         super().__init__(
             token=config['access_token'],
             prefix='!',
-            initial_channels=[self.get_user_name(config['access_token'])]
+            initial_channels=list(self.channel_tenants)
         )
         self.config = config
         self.socketio = socketio  # Flask-SocketIO instance
+        self.tenants = tenants
+
+        performance = config.get('performance') or {}
+        self.watchdog = LoopLagWatchdog(
+            interval=performance.get('loop_lag_interval', 1.0),
+            warn_threshold_ms=performance.get('loop_lag_warn_ms', 100),
+            report_interval=performance.get('loop_lag_report_interval', 60)
+        )
+        self.match_executor = self.create_match_executor(performance, {tenant.name: tenant.rules for tenant in tenants})
+        self._channel_tails = {}  # (Tenant name, channel name) -> last pending in-order emit task
+
+    @staticmethod
+    def create_match_executor(performance, rules_by_tenant):
+        """
+        Create the executor used to match expensive messages off the event loop. Each
+        worker receives every tenant's rules once when it starts.
+
+        Args:
+            performance (dict): The `performance` section of the configuration.
+            rules_by_tenant (dict): Tenant name -> HighlightRules.
 
-    def get_user_name(self, token):
+        Returns:
+            Executor or None: A thread or process pool, or None if offloading is disabled.
+        """
+        if not performance.get('offload_matching', False):
+            return None
+
+        max_workers = performance.get('offload_max_workers', 2)
+        # Only a process pool helps with slow patterns, as `re` holds the GIL while searching
+        if performance.get('offload_executor', 'process') == 'process':
+            # Workers are started from the IRC thread while other threads are running,
+            # where forking can deadlock, so spawn them instead
+            return ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(rules_by_tenant,)
+            )
+        return ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='highlight-match',
+            initializer=init_worker,
+            initargs=(rules_by_tenant,)
+        )
+
+    @staticmethod
+    def get_user_name(config):
         """
-        Retrieve the Twitch username associated with the provided access token.
+        Retrieve the Twitch username associated with the configured access token.
 
         Args:
-            token (str): The OAuth access token.
+            config (dict): Configuration dictionary containing the access token and Twitch settings.
 
         Returns:
             str: The username associated with the token.
@@ -64,13 +132,10 @@ class TwitchIRCClient(commands.Bot):
         Raises:
             Exception: If the token validation fails.
         """
-        url = 'https://id.twitch.tv/oauth2/validate'
-        headers = {'Authorization': f'Bearer {token}'}
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.json()['login']
-        else:
+        user_name = TwitchAuth(config).get_login(config['access_token'])
+        if user_name is None:
             raise Exception("Failed to validate token and retrieve username.")
+        return user_name
 
     async def event_ready(self):
         """
@@ -78,63 +143,189 @@ class TwitchIRCClient(commands.Bot):
         """
         print(f"Logged in as | {self.nick}")
         print(f"User ID is | {self.user_id}")
+        self.watchdog.start()
 
     async def event_message(self, message):
         """
-        Handle incoming chat messages.
+        Handle incoming chat messages, passing them to every tenant watching the channel.
 
         Args:
             message: TwitchIO message object representing a chat message.
         """
-        # Cache configuration values
-        words_to_highlight = self.config['words_to_highlight'].get('keywords', [])
-        case_sensitive = self.config['words_to_highlight'].get('case_sensitive', False)
-        match_whole_word = self.config['words_to_highlight'].get('match_whole_word', False)
-        process_own_messages = self.config.get('process_own_messages', False)
-        allow_non_mentions = self.config.get('allow_non_mentions', False)
-        highlight_timeout = self.config.get('highlight_timeout', 5000)
-        authenticated_user = self.nick.lower()
+        for tenant in self.channel_tenants.get(message.channel.name.lower(), ()):
+            self.process_message(tenant, message)
+
+    def process_message(self, tenant, message):
+        """
+        Match a chat message against a tenant's rules and emit it if it is a highlight.
+
+        Cheap messages are matched inline. Long messages, or all messages when the
+        rule set is large, are matched on the offload executor when it is enabled.
+        Highlights with a missing username colour wait briefly for a batched Helix
+        lookup. Highlights are always emitted in arrival order per tenant and channel.
 
+        Args:
+            tenant (Tenant): The tenant to process the message for.
+            message: TwitchIO message object representing a chat message.
+        """
         # Skip self-messages if not processing them
-        if not process_own_messages and message.author.name.lower() == self.nick.lower():
+        process_own_messages = tenant.config.get('process_own_messages', False)
+        if not process_own_messages and message.author.name.lower() == tenant.user_name:
             return
 
-        # Prepare keywords for matching
-        if not case_sensitive:
-            words_to_highlight = {word.lower() for word in words_to_highlight}
-            message_content = message.content.lower()
-        else:
-            words_to_highlight = set(words_to_highlight)
-            message_content = message.content
+        content = message.content
+        key = (tenant.name, message.channel.name.lower())
+        pending = self._channel_tails.get(key)
+        loop = asyncio.get_running_loop()
+        # Colour lookups may wait until this long after the message arrived
+        deadline = loop.time() + tenant.colour_timeout
 
-        # Compile regex based on match_whole_word
-        if match_whole_word:
-            # Match whole words only
-            keyword_pattern = re.compile(r'\b(' + '|'.join(re.escape(word) for word in words_to_highlight) + r')\b')
+        if self.match_executor is not None and tenant.rules.is_expensive(content):
+            match = loop.run_in_executor(self.match_executor, match_in_worker, tenant.name, content)
+            payload = self.build_payload(tenant, message)
         else:
-            # Match partial words as well
-            keyword_pattern = re.compile('|'.join(re.escape(word) for word in words_to_highlight))
-
-        # Check if the message meets highlighting criteria
-        is_mention = f"@{authenticated_user}" in message_content
-        is_keyword_highlight = keyword_pattern.search(message_content) is not None
-        is_highlight = is_mention or (allow_non_mentions and authenticated_user in message_content)
-
-        if is_highlight or is_keyword_highlight:
-            # Emit the message data to the frontend via Flask-SocketIO
-            try:
-                self.socketio.emit(
-                    'update_list',
-                    {
-                        'username': message.author.display_name,
-                        'username_colour': message.author.color,
-                        'message': message.content,
-                        'timeout': highlight_timeout
-                    },
-                    namespace='/'
-                )
-            except Exception as e:
-                print(f"Error emitting message to Flask-SocketIO: {e}")
+            if not match_message(tenant.rules, content):
+                return
+            payload = self.build_payload(tenant, message)
+            if pending is None and payload['username_colour']:
+                # Nothing queued for this channel and nothing to look up, so emit straight away
+                self.emit_highlight(tenant, payload)
+                return
+            match = loop.create_future()
+            match.set_result(True)
+
+        # Match and look up the colour now, so lookups from the same window share a batch
+        ready = asyncio.ensure_future(self._prepare_highlight(tenant, match, payload, message.author.id, deadline))
+
+        # Chain behind the previous message of this channel to keep highlights in order
+        tail = asyncio.ensure_future(self._emit_in_order(tenant, pending, ready, payload))
+        self._channel_tails[key] = tail
+        tail.add_done_callback(lambda task: self._release_tail(key, task))
+
+    async def _prepare_highlight(self, tenant, match, payload, user_id, deadline):
+        """
+        Wait for the match result and, for highlights, fill in a missing colour. This
+        runs as soon as the message arrives, independently of earlier highlights.
+
+        Args:
+            tenant (Tenant): The tenant the highlight belongs to.
+            match (asyncio.Future): Future resolving to the match result of this message.
+            payload (dict): The highlight payload to update in place.
+            user_id (str): Twitch user id of the message author.
+            deadline (float): Event loop time after which the colour lookup is abandoned.
+
+        Returns:
+            bool: True if the message is a highlight.
+        """
+        if not await match:
+            return False
+        await self.resolve_colour(tenant, payload, user_id, deadline)
+        return True
+
+    async def _emit_in_order(self, tenant, previous, ready, payload):
+        """
+        Wait for the previous highlight of the channel, then emit this one if it matched.
+
+        Args:
+            tenant (Tenant): The tenant the highlight belongs to.
+            previous (asyncio.Task or None): The previous in-order emit task of the channel.
+            ready (asyncio.Task): Task resolving to True once this message is a complete highlight.
+            payload (dict): The highlight payload to emit.
+        """
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            if await ready:
+                self.emit_highlight(tenant, payload)
+        except Exception as e:
+            print(f"Error processing highlight: {e}")
+
+    def _release_tail(self, key, task):
+        """
+        Forget the channel's tail once its last queued emit has finished.
+
+        Args:
+            key (tuple): The (tenant name, channel name) pair.
+            task (asyncio.Task): The emit task that finished.
+        """
+        if self._channel_tails.get(key) is task:
+            del self._channel_tails[key]
+
+    def build_payload(self, tenant, message):
+        """
+        Build the highlight payload sent to the frontend, filling a missing username
+        colour from the tenant's colour cache when it is already known. Any cache hit
+        completes the payload, falling back to a default colour if the user has none.
+
+        Args:
+            tenant (Tenant): The tenant the highlight belongs to.
+            message: TwitchIO message object representing a chat message.
+
+        Returns:
+            dict: The highlight payload.
+        """
+        payload = {
+            'username': message.author.display_name,
+            'username_colour': message.author.color,
+            'message': message.content,
+            'timeout': tenant.config.get('highlight_timeout', 5000)
+        }
+        if not payload['username_colour'] and tenant.colour_cache is not None:
+            cached = tenant.colour_cache.get(message.author.id)
+            if cached is not None:
+                self.apply_colour(payload, cached, message.author.id)
+        return payload
+
+    async def resolve_colour(self, tenant, payload, user_id, deadline):
+        """
+        Look up a missing username colour through Helix, giving up at `deadline`,
+        which is `colour_lookup.lookup_timeout` seconds after the message arrived.
+        If no colour is found in time, a default colour is used instead.
+
+        Args:
+            tenant (Tenant): The tenant whose colour cache is used for the lookup.
+            payload (dict): The highlight payload to update in place.
+            user_id (str): Twitch user id of the message author.
+            deadline (float): Event loop time after which the lookup is abandoned.
+        """
+        if payload['username_colour'] or tenant.colour_cache is None or not user_id:
+            return
+
+        timeout = deadline - asyncio.get_running_loop().time()
+        self.apply_colour(payload, await tenant.colour_cache.resolve(user_id, timeout), user_id)
+
+    @staticmethod
+    def apply_colour(payload, cached, user_id):
+        """
+        Copy a cached colour and display name into a highlight payload, using a
+        default colour for users who never set one.
+
+        Args:
+            payload (dict): The highlight payload to update in place.
+            cached (tuple): `(colour, display_name)` from the colour cache.
+            user_id (str): Twitch user id of the message author.
+        """
+        colour, display_name = cached
+        payload['username_colour'] = colour or default_colour(user_id)
+        if display_name and not payload['username']:
+            payload['username'] = display_name
+
+    def emit_highlight(self, tenant, payload):
+        """
+        Emit a highlight to the tenant's frontends via Flask-SocketIO and the
+        Server-Sent Events stream.
+
+        Args:
+            tenant (Tenant): The tenant the highlight belongs to.
+            payload (dict): The highlight payload.
+        """
+        try:
+            self.socketio.emit('update_list', payload, namespace='/', to=tenant.room)
+        except Exception as e:
+            print(f"Error emitting message to Flask-SocketIO: {e}")
+
+        if tenant.event_stream is not None:
+            tenant.event_stream.publish('update_list', payload)
 
     async def event_command_error(self, ctx, error):
         """
@@ -146,6 +337,17 @@ class TwitchIRCClient(commands.Bot):
         """
         print(f"An error occurred: {error}")
 
+    async def close(self):
+        """
+        Stop the loop lag watchdog, offload executor and colour lookups, then close the bot.
+        """
+        self.watchdog.stop()
+        if self.match_executor is not None:
+            self.match_executor.shutdown(wait=False)
+        for colour_cache in {tenant.colour_cache for tenant in self.tenants if tenant.colour_cache is not None}:
+            colour_cache.close()
+        await super().close()
+
     def run_bot(self):
         """
         Start the bot's event loop.
@@ -2,7 +2,9 @@
 web_server.py
 -------------
 This module defines the WebServer class responsible for hosting the frontend 
-web application and handling WebSocket connections using Flask-SocketIO.
+web application and handling WebSocket connections using Flask-SocketIO. Highlights
+are also available as a plain Server-Sent Events stream for display-only overlays.
+In multi-tenant mode each tenant's pages are served under `/t/<tenant>/`.
 
 Classes:
     - WebServer: Manages the Flask application and WebSocket routes for 
@@ -18,8 +20,9 @@ __email__ = "jaintp.dev@gmail.com"
 __status__ = "Production"
 __date__ = "08/12/2024"
 
-from flask import Flask, render_template
-from flask_socketio import SocketIO
+from flask import Flask, Response, abort, render_template, request
+from flask_socketio import SocketIO, join_room
+from event_stream import EventStream
 
 
 class WebServer:
@@ -29,6 +32,8 @@ class WebServer:
     Attributes:
         app (Flask): The Flask application instance.
         socketio (SocketIO): Flask-SocketIO instance for real-time communication.
+        event_stream (EventStream): Server-Sent Events broadcaster behind the `/stream` endpoint.
+        tenant_streams (dict): Tenant name -> Server-Sent Events broadcaster for multi-tenant mode.
         port (int): Port number the server runs on, specified in the configuration.
         config (dict): Application configuration dictionary.
     """
@@ -44,8 +49,77 @@ class WebServer:
         self.socketio = SocketIO(self.app)  # Initialize Flask-SocketIO
         self.port = config['server_ports']['web_server']
         self.config = config
+        self.event_stream = self.create_event_stream()
+        self.tenant_streams = {}  # Tenant name -> EventStream
         self.setup_routes()
 
+    def create_event_stream(self):
+        """
+        Create a Server-Sent Events broadcaster using the `event_stream` configuration.
+
+        Returns:
+            EventStream: The new broadcaster.
+        """
+        stream_config = self.config.get('event_stream') or {}
+        return EventStream(
+            history_size=stream_config.get('history_size', 100),
+            heartbeat_interval=stream_config.get('heartbeat_interval', 15),
+            retry_ms=stream_config.get('retry_ms', 3000)
+        )
+
+    def add_tenant(self, name):
+        """
+        Register a tenant, making its pages available under `/t/<name>/`.
+
+        Args:
+            name (str): The tenant name.
+
+        Returns:
+            EventStream: The tenant's Server-Sent Events broadcaster.
+        """
+        self.tenant_streams[name] = self.create_event_stream()
+        return self.tenant_streams[name]
+
+    def get_tenant_stream(self, name):
+        """
+        Look up a tenant's broadcaster, aborting the request if the tenant is unknown.
+
+        Args:
+            name (str): The tenant name.
+
+        Returns:
+            EventStream: The tenant's Server-Sent Events broadcaster.
+        """
+        if name not in self.tenant_streams:
+            abort(404)
+        return self.tenant_streams[name]
+
+    @staticmethod
+    def stream_response(event_stream):
+        """
+        Build a streaming Server-Sent Events response for the current request.
+
+        Browsers resume after a reconnect by sending the `Last-Event-ID` header;
+        a `lastEventId` query parameter is accepted for the first connection.
+
+        Args:
+            event_stream (EventStream): The broadcaster to stream from.
+
+        Returns:
+            Response: A streaming `text/event-stream` response.
+        """
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+
+        return Response(
+            event_stream.stream(last_event_id),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
     def setup_routes(self):
         """
         Define routes and WebSocket event handlers for the server.
@@ -60,11 +134,76 @@ class WebServer:
             """
             return render_template('frontend.html')
 
+        @self.app.route('/overlay')
+        def overlay():
+            """
+            Serve the display-only frontend page, which uses Server-Sent Events.
+
+            Returns:
+                str: Rendered HTML content of the overlay page.
+            """
+            return render_template('frontend_sse.html', stream_url='/stream')
+
+        @self.app.route('/stream')
+        def stream():
+            """
+            Stream highlights as Server-Sent Events.
+
+            Returns:
+                Response: A streaming `text/event-stream` response.
+            """
+            return self.stream_response(self.event_stream)
+
+        @self.app.route('/t/<tenant>/')
+        def tenant_home(tenant):
+            """
+            Serve the main frontend page for a tenant.
+
+            Args:
+                tenant (str): The tenant name.
+
+            Returns:
+                str: Rendered HTML content of the frontend page.
+            """
+            self.get_tenant_stream(tenant)
+            return render_template('frontend.html', tenant=tenant)
+
+        @self.app.route('/t/<tenant>/overlay')
+        def tenant_overlay(tenant):
+            """
+            Serve the display-only frontend page for a tenant.
+
+            Args:
+                tenant (str): The tenant name.
+
+            Returns:
+                str: Rendered HTML content of the overlay page.
+            """
+            self.get_tenant_stream(tenant)
+            return render_template('frontend_sse.html', stream_url=f'/t/{tenant}/stream')
+
+        @self.app.route('/t/<tenant>/stream')
+        def tenant_stream(tenant):
+            """
+            Stream a tenant's highlights as Server-Sent Events.
+
+            Args:
+                tenant (str): The tenant name.
+
+            Returns:
+                Response: A streaming `text/event-stream` response.
+            """
+            return self.stream_response(self.get_tenant_stream(tenant))
+
         @self.socketio.on('connect')
         def handle_connect():
             """
-            Handle WebSocket connection events.
+            Handle WebSocket connection events. Clients of a tenant page pass the
+            tenant name in the query string and join that tenant's room.
             """
+            tenant = request.args.get('tenant')
+            if tenant in self.tenant_streams:
+                join_room(tenant)
             print("Client connected to WebSocket")
 
         @self.socketio.on('disconnect')
@@ -0,0 +1,126 @@
+"""
+test_colour_cache.py
+--------------------
+Tests for `UserColourCache` against a local stub of the Helix `GET /chat/color` endpoint.
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, path.join(path.dirname(path.abspath(__file__)), '..', 'src'))
+
+from colour_cache import UserColourCache, default_colour
+
+
+class HelixStub:
+    """
+    Local stand-in for the Helix `GET /chat/color` endpoint that records every request.
+
+    Attributes:
+        requests (list): The user ids sent in each request, in order.
+        mode (str): "ok" to answer, "error" to return HTTP 500, "hang" to block until released.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.mode = 'ok'
+        self.release = threading.Event()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                user_ids = parse_qs(urlparse(self.path).query).get('user_id', [])
+                stub.requests.append(user_ids)
+                if stub.mode == 'hang':
+                    stub.release.wait(5)
+                if stub.mode == 'error':
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+
+                data = [{'user_id': user_id, 'user_name': f'User{user_id}', 'color': '#123456'} for user_id in user_ids]
+                body = json.dumps({'data': data}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}/helix'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class UserColourCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.stub = HelixStub()
+        self.cache = UserColourCache({
+            'client_id': 'client',
+            'access_token': 'token',
+            'colour_lookup': {'helix_url': self.stub.url, 'batch_window_ms': 50, 'failure_ttl': 30}
+        })
+
+    def tearDown(self):
+        self.cache.close()
+        self.stub.close()
+
+    async def test_misses_in_one_window_share_a_request(self):
+        results = await asyncio.gather(*(self.cache.lookup(str(user_id)) for user_id in range(5)))
+
+        self.assertEqual(len(self.stub.requests), 1)
+        self.assertEqual(sorted(self.stub.requests[0]), [str(user_id) for user_id in range(5)])
+        self.assertEqual(results[0], ('#123456', 'User0'))
+
+    async def test_batches_are_capped_at_100_ids(self):
+        await asyncio.gather(*(self.cache.lookup(str(user_id)) for user_id in range(150)))
+
+        self.assertEqual(sorted(len(user_ids) for user_ids in self.stub.requests), [50, 100])
+
+    async def test_cache_hits_do_not_request(self):
+        await self.cache.lookup('1')
+        future = self.cache.lookup('1')
+
+        self.assertTrue(future.done())
+        self.assertEqual(len(self.stub.requests), 1)
+
+    async def test_timeout_falls_back_to_default_colour(self):
+        self.stub.mode = 'hang'
+
+        started = time.monotonic()
+        colour, display_name = await self.cache.resolve('42', 0.2)
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(colour, default_colour('42'))
+        self.assertIsNone(display_name)
+
+        # The timeout is cached, so the next highlight from the same user does not wait
+        future = self.cache.lookup('42')
+        self.assertTrue(future.done())
+
+    async def test_failed_batch_is_cached_briefly(self):
+        self.stub.mode = 'error'
+
+        colour, _ = await self.cache.resolve('7', 2)
+        self.assertEqual(colour, default_colour('7'))
+
+        await self.cache.resolve('7', 2)
+        self.assertEqual(len(self.stub.requests), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()